@@ -1,14 +1,19 @@
 import pandas as pd
 import numpy as np
 import logging
-from itertools import compress
 
-from pyam.index import replace_index_values
-from pyam.logging import adjust_log_level
+from pyam.index import (
+    append_index_level,
+    get_index_levels,
+    get_index_levels_codes,
+    get_keep_col,
+    replace_index_values,
+    replace_values,
+)
 from pyam.utils import (
-    islistable,
     isstr,
     find_depth,
+    pattern_match,
     reduce_hierarchy,
     KNOWN_FUNCS,
     to_list,
@@ -18,45 +23,61 @@ from pyam._compare import _compare
 
 logger = logging.getLogger(__name__)
 
+NO_COMPONENTS_MSG = "Cannot aggregate variable '{}' because it has no components!"
+
 
-def _aggregate(df, variable, components=None, method=np.sum):
+def _aggregate(df, variable, components=None, method="sum"):
     """Internal implementation of the `aggregate` function"""
+    if isstr(variable):
+        return _aggregate_single(df, variable, components, method)
 
     # list of variables require default components (no manual list)
-    if islistable(variable) and components is not None:
+    if components is not None:
         raise ValueError(
             "Aggregating by list of variables does not support `components`!"
         )
+    return _aggregate_many(df, to_list(variable), method)
 
-    mapping = {}
-    msg = "Cannot aggregate variable '{}' because it has no components!"
-    # if single variable
-    if isstr(variable):
-        # default components to all variables one level below `variable`
-        components = components or df._variable_components(variable)
 
-        if not len(components):
-            logger.info(msg.format(variable))
-            return
+def _aggregate_single(df, variable, components=None, method="sum"):
+    """Internal implementation of the `aggregate` function for a single variable"""
 
-        for c in components:
-            mapping[c] = variable
+    # default components to all variables one level below `variable`
+    if not components:
+        variables, parents = df._variable_parents()
+        components = list(variables[parents == variable])
 
-    # else, use all variables one level below `variable` as components
-    else:
-        for v in variable if islistable(variable) else [variable]:
-            _components = df._variable_components(v)
-            if not len(_components):
-                logger.info(msg.format(v))
-                continue
+    if not len(components):
+        logger.info(NO_COMPONENTS_MSG.format(variable))
+        return
+
+    mapping = dict(zip(components, [variable] * len(components)))
+    return _aggregate_mapping(df, mapping, _get_method_func(method))
+
+
+def _aggregate_many(df, variables, method="sum"):
+    """Internal implementation of the `aggregate` function for a list of variables"""
+
+    # use all variables one level below each of `variables` as components
+    mapping = {}
+    _variables, parents = df._variable_parents()
+    for v in variables:
+        _components = _variables[parents == v]
+        if not len(_components):
+            logger.info(NO_COMPONENTS_MSG.format(v))
+            continue
+
+        mapping.update(zip(_components, [v] * len(_components)))
+
+    return _aggregate_mapping(df, mapping, _get_method_func(method))
 
-            for c in _components:
-                mapping[c] = v
 
-    # rename all components to `variable` and aggregate
-    _df = df._data[df._apply_filters(variable=mapping.keys())]
-    _df.index = replace_index_values(_df, "variable", mapping)
-    return _group_and_agg(_df, [], method)
+def _aggregate_mapping(df, mapping, method):
+    """Rename all components to their target variable and aggregate"""
+    components = np.array(list(mapping), dtype=object)
+    targets = np.array(list(mapping.values()), dtype=object)
+    _df = df._data[_variable_rows(df, components)]
+    return _group_and_agg(_df, [], method, mapping=dict(variable=(components, targets)))
 
 
 def _aggregate_recursive(df, variable, recursive):
@@ -64,37 +85,61 @@ def _aggregate_recursive(df, variable, recursive):
 
     # downselect to components of `variable`, initialize list for aggregated (new) data
     # keep variable at highest level if it exists
-    _df = df.filter(variable=[variable, f"{variable}|*"])
+    _data = df.filter(variable=[variable, f"{variable}|*"])._data
     data_list = []
 
+    # determine depth and parent of all variables (only once) and the depth by row
+    variables, var_codes = get_index_levels_codes(_data, "variable")
+    variables = np.array(variables)
+    depths = np.array(find_depth(variables))
+    parents = np.array([reduce_hierarchy(v, -1) for v in variables])
+    row_depths = depths[var_codes]
+
+    # the data is never modified, aggregated values are only used at the next depth
+    _data_new = _data.iloc[:0]
+
     # iterate over variables (bottom-up) and aggregate all components up to `variable`
-    for d in reversed(range(find_depth(variable), max(find_depth(_df.variable)))):
-        components = compress(_df.variable, find_depth(_df.variable, level=d + 1))
-        var_list = set([reduce_hierarchy(v, -1) for v in components])
-
-        # a temporary dataframe allows to distinguish between full data and new data
-        _data_agg = _aggregate(_df, variable=var_list)
-
-        # check if data for intermediate variables already exists
-        with adjust_log_level("pyam.core"):
-            _data_self = _df.filter(variable=var_list)._data
-        _overlap = _data_agg.index.intersection(_data_self.index)
-        _new = _data_agg.index.difference(_data_self.index)
-
-        # assert that aggregated values are consistent with existing data (optional)
-        if recursive != "skip-validate" and not _overlap.empty:
-            conflict = _compare(_data_self, _data_agg[_overlap], "self", "aggregate")
-            if not conflict.empty:
-                msg = "Aggregated values are inconsistent with existing data:"
-                raise ValueError(f"{msg}\n{conflict}")
-
-        # append aggregated values that are not already in data
-        _df.append(_data_agg[_new], inplace=True)
-        data_list.append(_data_agg[_new])
+    for d in reversed(range(find_depth(variable), depths.max())):
+        # aggregate all variables at depth `d + 1` (incl. from the previous iteration)
+        components = depths == d + 1
+        var_list = np.unique(parents[components])
+        mapping = dict(variable=(variables[components], parents[components]))
+        _data_components = pd.concat([_data[row_depths == d + 1], _data_new])
+        _data_agg = _group_and_agg(_data_components, [], mapping=mapping)
+
+        # keep aggregated values that are not already in data
+        _data_new = _validate_aggregate(_data, _data_agg, recursive)
+        data_list.append(_data_new)
+
+        # add new (intermediate) variables to the depth and parent arrays
+        _vars = np.setdiff1d(var_list, variables)
+        variables = np.append(variables, _vars)
+        depths = np.append(depths, np.full(len(_vars), d))
+        parents = np.append(parents, [reduce_hierarchy(v, -1) for v in _vars])
 
     return pd.concat(data_list)
 
 
+def _validate_aggregate(data, data_agg, recursive):
+    """Return aggregated values that are not in `data`, check for consistency"""
+
+    # check if data for (intermediate) aggregated variables already exists
+    variables, var_codes = get_index_levels_codes(data, "variable")
+    var_list = data_agg.index.get_level_values("variable").unique()
+    _data_self = data[np.isin(variables, var_list)[var_codes]]
+    _overlap = data_agg.index.intersection(_data_self.index)
+    _new = data_agg.index.difference(_data_self.index)
+
+    # assert that aggregated values are consistent with existing data (optional)
+    if recursive != "skip-validate" and not _overlap.empty:
+        conflict = _compare(_data_self, data_agg[_overlap], "self", "aggregate")
+        if not conflict.empty:
+            msg = "Aggregated values are inconsistent with existing data:"
+            raise ValueError(f"{msg}\n{conflict}")
+
+    return data_agg[_new]
+
+
 def _aggregate_region(
     df,
     variable,
@@ -114,6 +159,9 @@ def _aggregate_region(
     if weight is not None and components is not False:
         raise ValueError("Using weights and components in one operation not supported!")
 
+    # translate `method` before filtering data for subregions and components
+    method = _get_method_func(method)
+
     # default subregions to all regions other than `region`
     subregions = subregions or df._all_other_regions(region, variable)
 
@@ -146,61 +194,209 @@ def _aggregate_region(
 
     # if not `components=False`, add components at the `region` level
     if components:
-        with adjust_log_level("pyam.core"):
-            region_df = df.filter(region=region)
+        region_rows = df._apply_filters(region=region)
 
         # if `True`, auto-detect `components` at the `region` level,
         # defaults to variables below `variable` only present in `region`
         if components is True:
-            level = dict(level=None)
-            r_comps = region_df._variable_components(variable, **level)
-            sr_comps = subregion_df._variable_components(variable, **level)
-            components = set(r_comps).difference(sr_comps)
+            var_level, var_codes = get_index_levels_codes(df._data, "variable")
+            r_vars = var_level[np.unique(var_codes[region_rows])]
+            components = r_vars.difference(subregion_df.variable)
+
+            # pattern-match only variables that do not exist in any subregion
+            if len(components):
+                components = components[pattern_match(components, f"{variable}|*")]
 
         if len(components):
             # rename all components to `variable` and aggregate
-            rows = region_df._apply_filters(variable=components)
-            _df = region_df._data[rows]
-            mapping = {c: variable for c in components}
-            _df.index = replace_index_values(_df.index, "variable", mapping)
-            _data = _data.add(_group_and_agg(_df, "region"), fill_value=0)
+            rows = region_rows & _variable_rows(df, components)
+            mapping = dict(variable={c: variable for c in components})
+            _df = _group_and_agg(df._data[rows], "region", mapping=mapping)
+            _data = _add_aligned(_data, _df)
+
+    return _data
+
+
+def _add_aligned(left, right):
+    """Add two `pd.Series` where missing values (or rows) are interpreted as 0
+
+    Equivalent to :meth:`pandas.Series.add` with `fill_value=0` for a unique
+    index of `left`, but without outer alignment of the full index.
+    """
+    pos = left.index.get_indexer(right.index)
+    match = pos != -1
 
+    # add values of `right` at the position of the same index in `left`
+    values = left.values.copy()
+    _left, _right = values[pos[match]], right.values[match]
+    values[pos[match]] = np.where(
+        np.isnan(_left) & np.isnan(_right), np.nan, np.nansum([_left, _right], axis=0)
+    )
+    _data = pd.Series(values, index=left.index, name=left.name)
+
+    # append rows of `right` that do not exist in `left`
+    if not match.all():
+        _data = pd.concat([_data, right[~match]])
     return _data
 
 
-def _aggregate_time(df, variable, column, value, components, method=np.sum):
+def _aggregate_time(df, variable, column, value, components, method="sum"):
     """Internal implementation for aggregating data over subannual time"""
+    # translate `method` to a function (raises an error early if unknown)
+    method = _get_method_func(method)
+
     # default `components` to all entries in `column` other than `value`
     if components is None:
-        components = list(set(df.data.subannual.unique()) - set([value]))
+        components = [c for c in get_index_levels(df._data, column) if c != value]
 
-    # compute aggregate over time
+    # compute aggregate over time (without casting to a wide format)
     filter_args = dict(variable=variable)
     filter_args[column] = components
-    index = [d for d in df.dimensions if d != column]
-
-    _data = pd.concat(
-        [
-            df.filter(**filter_args)
-            .data.pivot_table(index=index, columns=column)
-            .value.rename_axis(None, axis=1)
-            .apply(_get_method_func(method), axis=1)
-        ],
-        names=[column] + index,
-        keys=[value],
-    )
+    _data = _group_and_agg(df._data[df._apply_filters(**filter_args)], column, method)
 
-    # reset index-level order to original IamDataFrame
-    _data.index = _data.index.reorder_levels(df.dimensions)
+    # add `value` as `column` and reset index-level order to original IamDataFrame
+    _data.index = append_index_level(
+        _data.index, np.zeros(len(_data), dtype=int), [value], column, df.dimensions
+    )
 
     return _data
 
 
-def _group_and_agg(df, by, method=np.sum):
-    """Group-by & aggregate `pd.Series` by index names on `by`"""
+def _variable_rows(df, variables):
+    """Return boolean mask of rows in `df._data` with a variable in `variables`
+
+    In contrast to :meth:`IamDataFrame._apply_filters`, variables are matched exactly
+    (without pseudo-regex) using the codes of the index.
+    """
+    level, codes = get_index_levels_codes(df._data, "variable")
+    matches = level.get_indexer(to_list(variables))
+    return get_keep_col(codes, matches[matches != -1])
+
+
+def _group_and_agg(df, by, method="sum", mapping=None):
+    """Group-by & aggregate `pd.Series` by index names on `by`
+
+    If given, values of the index are renamed prior to grouping using a `mapping`
+    of the format `{level: {current_name: target_name}}`
+    or `{level: (current_names, target_names)}` with two arrays of equal length.
+    """
     cols = df.index.names.difference(to_list(by))
-    # pick aggregator func (default: sum)
-    return df.groupby(cols).agg(_get_method_func(method))
+    # pick aggregator func (default: sum), no-op if already resolved by the caller
+    method = _get_method_func(method)
+
+    # use a reduction over the codes of the index for known methods
+    if method in GROUP_KERNELS and len(cols) > 1 and not df.empty:
+        _data = _group_and_agg_codes(df, cols, GROUP_KERNELS[method], mapping)
+        if _data is not None:
+            return _data
+
+    if mapping:
+        index = df.index
+        for level, _mapping in mapping.items():
+            index = replace_index_values(index, level, _mapping)
+        df = pd.Series(df.values, index=index, name=df.name)
+
+    grouped = df.groupby(level=cols, observed=True, sort=False)
+
+    # use the named groupby-method for known functions (avoids the generic `agg()`)
+    if method in GROUPBY_METHODS:
+        return getattr(grouped, GROUPBY_METHODS[method])()
+    return grouped.agg(method)
+
+
+def _group_and_agg_codes(df, cols, kernel, mapping=None):
+    """Aggregate `pd.Series` over the (factorized) codes of the index levels `cols`
+
+    Returns None if the number of level-combinations cannot be cast to int64.
+    """
+    groups = _factorize_index(df.index, cols, mapping)
+    if groups is None:
+        return None
+
+    keep, group, _index = groups
+    values = kernel(group, df.values[keep], len(_index))
+    return pd.Series(values, index=_index, name=df.name)
+
+
+def _factorize_index(index, cols, mapping=None):
+    """Factorize the combinations of the index levels `cols`
+
+    Returns a boolean mask of rows without missing index values, the group codes
+    of these rows and a :class:`pandas.MultiIndex` of the unique combinations,
+    or None if the number of level-combinations cannot be cast to int64.
+    """
+    levels, codes = [], []
+    for c in cols:
+        n = index._get_level_number(c)
+        _level, _codes = index.levels[n], index.codes[n]
+
+        # rename level values and re-map the codes (instead of the full index)
+        if mapping and c in mapping:
+            remap = replace_values(_level, mapping[c])
+            level_codes, _level = pd.factorize(remap, sort=True)
+            _codes = np.where(_codes != -1, level_codes[_codes], -1)
+            _level = pd.Index(_level, name=c)
+
+        levels.append(_level)
+        codes.append(_codes)
+
+    shape = [len(lvl) for lvl in levels]
+    if np.prod(shape, dtype=object) >= np.iinfo(np.int64).max:
+        return None
+
+    # drop rows with missing index values (consistent with `groupby()`)
+    keep = np.logical_and.reduce([c != -1 for c in codes])
+    key = np.ravel_multi_index([c[keep] for c in codes], shape)
+
+    # factorize the combined codes and rebuild the index of unique combinations
+    group, uniques = pd.factorize(key)
+    _index = pd.MultiIndex(
+        levels=levels, codes=list(np.unravel_index(uniques, shape)), names=cols
+    )
+    return keep, group, _index
+
+
+def _group_sum(group, values, n):
+    """Sum of `values` by `group` (missing values are interpreted as 0)"""
+    values = np.where(np.isnan(values), 0, values)
+    return np.bincount(group, weights=values, minlength=n)
+
+
+def _group_mean(group, values, n):
+    """Mean of `values` by `group` ignoring missing values"""
+    isnan = np.isnan(values)
+    count = np.bincount(group, weights=~isnan, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _group_sum(group, values, n) / count
+
+
+def _group_min(group, values, n):
+    """Minimum of `values` by `group` ignoring missing values"""
+    ret = np.full(n, np.nan)
+    np.fmin.at(ret, group, values)
+    return ret
+
+
+def _group_max(group, values, n):
+    """Maximum of `values` by `group` ignoring missing values"""
+    ret = np.full(n, np.nan)
+    np.fmax.at(ret, group, values)
+    return ret
+
+
+GROUP_KERNELS = {
+    np.sum: _group_sum,
+    np.mean: _group_mean,
+    np.min: _group_min,
+    np.max: _group_max,
+}
+
+GROUPBY_METHODS = {
+    np.sum: "sum",
+    np.mean: "mean",
+    np.min: "min",
+    np.max: "max",
+}
 
 
 def _agg_weight(data, weight, method, drop_negative_weights):
@@ -228,9 +424,35 @@ def _agg_weight(data, weight, method, drop_negative_weights):
 
     col1 = data.index.names.difference(["region"])
     col2 = data.index.names.difference(["region", "variable", "unit"])
-    return (data * weight).groupby(col1).apply(
-        pd.Series.sum, skipna=False
-    ) / weight.groupby(col2).sum()
+
+    # compute weighted sum and sum of weights in one pass over the group codes
+    num, den = _factorize_index(data.index, col1), _factorize_index(data.index, col2)
+    if num is None or den is None or not (num[0].all() and den[0].all()):
+        return (data * weight).groupby(col1, observed=True, sort=False).apply(
+            pd.Series.sum, skipna=False
+        ) / weight.groupby(col2, observed=True, sort=False).sum()
+
+    (_, num_group, num_index), (_, den_group, _) = num, den
+    _data = _agg_weight_kernel(
+        data.values, weight.values, num_group, den_group, len(num_index)
+    )
+    return pd.Series(_data, index=num_index, name=data.name)
+
+
+def _agg_weight_kernel(values, weights, num_group, den_group, n):
+    """Weighted sum of `values` by `num_group` divided by the sum of `weights`
+
+    Missing values in the weighted sum are propagated, missing weights are
+    ignored in the sum of weights (consistent with the `groupby()` implementation).
+    """
+    num = np.bincount(num_group, weights=values * weights, minlength=n)
+    den = np.bincount(den_group, weights=np.where(np.isnan(weights), 0, weights))
+
+    # map each group of the weighted sum to its group in the sum of weights
+    num_to_den = np.empty(n, dtype=int)
+    num_to_den[num_group] = den_group
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / den[num_to_den]
 
 
 def _get_method_func(method):
@@ -39,6 +39,7 @@ from pyam.utils import (
     format_time_col,
     merge_meta,
     find_depth,
+    reduce_hierarchy,
     pattern_match,
     years_match,
     month_match,
@@ -184,6 +185,9 @@ class IamDataFrame(object):
 
         self._data, index, self.time_col, self.extra_cols = _data
 
+        # cache of the variable hierarchy, see `_variable_parents()`
+        self._variable_parents_cache = None
+
         # define `meta` dataframe for categorization & quantitative indicators
         self.meta = pd.DataFrame(index=_make_index(self._data, cols=index))
         self.reset_exclude()
@@ -1457,6 +1461,11 @@ class IamDataFrame(object):
         append : bool, optional
             append the aggregate timeseries to `self` and return None,
             else return aggregate timeseries as new :class:`IamDataFrame`
+
+        Notes
+        -----
+        Missing timeslices are skipped, i.e., `method` is only applied to the
+        timeslices that exist for each timeseries.
         """
         _df = _aggregate_time(
             self,
@@ -1545,14 +1554,21 @@ class IamDataFrame(object):
         rows = self._apply_filters(variable=variable)
         return self._data[rows].index.get_level_values("region").difference([region])
 
-    def _variable_components(self, variable, level=0):
-        """Get all components (sub-categories) of a variable for a given level
+    def _variable_parents(self):
+        """Return all variables and their parent (one level up in the hierarchy)
 
-        If `level=0`, for `variable='foo'`, return `['foo|bar']`, but don't
-        include `'foo|bar|baz'`, which is a sub-sub-category. If `level=None`,
-        all variables below `variable` in the hierarchy are returned."""
-        var_list = pd.Series(self.variable)
-        return var_list[pattern_match(var_list, "{}|*".format(variable), level=level)]
+        The result is cached and keyed on the identity of the `variable` level object
+        of the index (:attr:`pandas.MultiIndex.levels` returns the same object as long
+        as the index is unchanged). Any operation that modifies the index creates a
+        new level object, so that the cache is rebuilt on the next call.
+        """
+        level, _ = get_index_levels_codes(self._data, "variable")
+        cache = self._variable_parents_cache
+        if cache is None or cache[0] is not level:
+            variables = pd.Series(level, dtype=object)
+            parents = pd.Series([reduce_hierarchy(v, -1) for v in level], dtype=object)
+            self._variable_parents_cache = (level, variables, parents)
+        return self._variable_parents_cache[1:]
 
     def _get_cols(self, cols):
         """Return a list of columns of `self.data`"""
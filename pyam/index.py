@@ -41,7 +41,11 @@ def get_keep_col(codes, matches):
 
 
 def replace_index_values(df, level, mapping, rows=None):
-    """Replace one or several category-values at a specific level (for specific rows)"""
+    """Replace one or several category-values at a specific level (for specific rows)
+
+    The `mapping` can be given as a dictionary or as a tuple of two arrays
+    of current values and target values.
+    """
     index = df if isinstance(df, pd.Index) else df.index
 
     n = index._get_level_number(level)
@@ -62,7 +66,7 @@ def replace_index_values(df, level, mapping, rows=None):
         )
 
     # else, replace the level values for the entire index dimension
-    _levels = index.levels[n].map(lambda l: mapping.get(l, l))
+    _levels = replace_values(index.levels[n], mapping)
     _unique_levels = _levels.unique()
 
     # if no duplicate levels exist after replace, set new levels and return
@@ -75,6 +79,21 @@ def replace_index_values(df, level, mapping, rows=None):
     return index.set_codes(_codes, n).set_levels(_unique_levels, n)
 
 
+def replace_values(values, mapping):
+    """Replace values of a :class:`pandas.Index` given a mapping (dict or two arrays)"""
+    if not isinstance(mapping, tuple):
+        mapping = (list(mapping), list(mapping.values()))
+    current, target = mapping
+    if not len(current):
+        return values
+
+    # look up the position of each value in `current` (-1 if not to be replaced)
+    pos = pd.Index(current).get_indexer(values)
+    target = np.asarray(target, dtype=object)[pos]
+    _values = np.where(pos != -1, target, values.astype(object))
+    return pd.Index(_values.tolist(), name=values.name)
+
+
 def append_index_col(index, values, name, order=False):
     """Append a list of `values` as a new column (level) to an `index`"""
     levels = pd.Index(values).unique()
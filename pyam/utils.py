@@ -423,12 +423,14 @@ def find_depth(data, s="", level=None):
 def _find_depth(data, s="", level=None):
     """Internal implementation of `find_depth()´"""
     # remove wildcard as last character from string, escape regex characters
-    _s = re.compile("^" + _escape_regexp(s.rstrip("*")))
-    _p = re.compile("\\|")
+    s = s.rstrip("*")
+    _s = re.compile("^" + _escape_regexp(s))
 
-    # find depth
+    # find depth (count the pipes directly if there is no leading string `s`)
     def _count_pipes(val):
-        return len(_p.findall(re.sub(_s, "", val))) if _s.match(val) else None
+        if not s:
+            return val.count("|")
+        return _s.sub("", val).count("|") if _s.match(val) else None
 
     n_pipes = map(_count_pipes, to_list(data))
 
@@ -652,6 +654,10 @@ def concat_with_pipe(x, cols=None):
 
 def reduce_hierarchy(x, depth):
     """Reduce the hierarchy (indicated by ``|``) of x to the specified depth"""
+    # shortcut for the parent variable (one level up in the hierarchy)
+    if depth == -1:
+        return x.rpartition("|")[0]
+
     _x = x.split("|")
     depth = len(_x) + depth - 1 if depth < 0 else depth
     return "|".join(_x[0 : (depth + 1)])
@@ -4,7 +4,10 @@ import logging
 import numpy as np
 import pandas as pd
 from pyam import check_aggregate, IamDataFrame, IAMC_IDX
+from pyam.aggregation import _add_aligned, _get_method_func, _group_and_agg
+from pyam.index import replace_index_values
 from pyam.testing import assert_iamframe_equal
+from pyam.utils import to_list
 from conftest import TEST_YEARS, DTS_MAPPING
 
 LONG_IDX = IAMC_IDX + ["year"]
@@ -128,11 +131,22 @@ def test_aggregate_with_components(simple_df):
     assert df.check_aggregate("Primary Energy", components=components) is None
 
 
+def test_aggregate_after_rename_inplace(simple_df):
+    # the cached variable hierarchy is reset when the variables change
+    variables, parents = simple_df._variable_parents()
+    assert simple_df._variable_parents()[1] is parents
+
+    simple_df.rename(variable={"Primary Energy|Wind": "foo"}, inplace=True)
+    assert "foo" in list(simple_df._variable_parents()[0])
+    assert simple_df.check_aggregate("Primary Energy") is not None
+
+
 def test_aggregate_by_list_with_components_raises(simple_df):
     # using list of variables and components raises an error
     v = ["Primary Energy", "Emissions|CO2"]
     components = ["Primary Energy|Coal", "Primary Energy|Wind"]
     pytest.raises(ValueError, simple_df.aggregate, v, components=components)
+    pytest.raises(ValueError, simple_df.check_aggregate, v, components=components)
 
 
 def test_aggregate_recursive(recursive_df):
@@ -330,6 +344,48 @@ def test_agg_weight():
     np.testing.assert_array_equal(obs_2.values, exp_2)
 
 
+@pytest.mark.parametrize("method", (np.sum, np.mean, np.min, np.max))
+@pytest.mark.parametrize("by", ("region", ["region", "variable"]))
+def test_group_and_agg(simple_df, method, by):
+    # the reduction over index codes must match the `groupby()` implementation
+    data = simple_df._data.copy()
+    data.iloc[[0, 3]] = np.nan
+    cols = data.index.names.difference(to_list(by))
+    exp = data.groupby(cols, sort=False).agg(method)
+    pd.testing.assert_series_equal(_group_and_agg(data, by, method), exp)
+
+
+@pytest.mark.parametrize("method", ("sum", np.mean, "min", np.max))
+def test_group_and_agg_single_level(simple_df, method):
+    # grouping by one level uses the named `groupby()`-methods
+    data = simple_df._data
+    by = [i for i in data.index.names if i != "region"]
+    exp = data.groupby("region", sort=False).agg(_get_method_func(method))
+    pd.testing.assert_series_equal(_group_and_agg(data, by, method), exp)
+
+
+@pytest.mark.parametrize("method", (np.sum, np.max, np.median))
+def test_group_and_agg_mapping(simple_df, method):
+    # renaming via `mapping` must match renaming the index before `groupby()`
+    data = simple_df._data
+    mapping = {"Primary Energy|Coal": "Primary Energy", "Emissions|CO2": "foo"}
+    renamed = pd.Series(data.values, replace_index_values(data, "variable", mapping))
+    exp = renamed.groupby(renamed.index.names, sort=False).agg(method)
+    obs = _group_and_agg(data, [], method, mapping=dict(variable=mapping))
+    pd.testing.assert_series_equal(obs, exp, check_names=False)
+
+
+def test_add_aligned(simple_df):
+    # adding with missing values and rows must match `add(fill_value=0)`
+    left = simple_df.filter(region="World")._data.droplevel("region")
+    right = simple_df.filter(region="reg_a")._data.droplevel("region")
+    left.iloc[[0, 1]], right.iloc[[1, 2]] = np.nan, np.nan
+    left, right = left.iloc[:-2], right.iloc[2:]
+
+    exp = left.add(right, fill_value=0)
+    pd.testing.assert_series_equal(_add_aligned(left, right).sort_index(), exp)
+
+
 def test_aggregate_region_with_no_weights_drop_negative_weights_raises(simple_df):
     # dropping negative weights can only be used with weight
     pytest.raises(
@@ -412,6 +468,35 @@ def test_aggregate_time(subannual_df, variable):
     assert_iamframe_equal(subannual_df.aggregate_time(variable), exp)
 
 
+@pytest.mark.parametrize("method", ("max", np.max))
+def test_aggregate_time_other_method(subannual_df, method):
+    # the maximum over timeslices in the test data is always the `winter` value
+    exp = subannual_df.filter(variable="Primary Energy", subannual="winter")
+    exp.rename(subannual={"winter": "year"}, inplace=True)
+    obs = subannual_df.aggregate_time("Primary Energy", method=method)
+    assert_iamframe_equal(obs, exp)
+
+
+def test_aggregate_time_by_groupby(subannual_df):
+    # methods without reduction kernel use `groupby()` on the long-format data
+    exp = subannual_df.filter(variable="Primary Energy", subannual="year")
+    exp._data = exp._data * 0.5
+    obs = subannual_df.aggregate_time("Primary Energy", method=np.median)
+    assert_iamframe_equal(obs, exp)
+
+
+def test_aggregate_time_missing_timeslice(subannual_df):
+    # missing timeslices are skipped, i.e., `method` is applied to existing values
+    args = dict(variable="Primary Energy", subannual="summer", year=2005)
+    _df = subannual_df.filter(**args, keep=False)
+
+    exp = subannual_df.filter(variable="Primary Energy", subannual="year")
+    exp._data = exp._data * 0.5
+    exp._data[exp._apply_filters(year=2005)] *= 1.4
+    obs = _df.aggregate_time("Primary Energy", method=np.median)
+    assert_iamframe_equal(obs, exp)
+
+
 def test_check_internal_consistency(simple_df):
     _df = simple_df.filter(variable="Price|Carbon", keep=False)
 
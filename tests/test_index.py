@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 import pandas.testing as pdt
 
@@ -27,12 +28,19 @@ def test_get_index_levels_raises(test_df_index):
     ],
 )
 @pytest.mark.parametrize("rows", (None, [False, True, True]))
-def test_replace_index_level(test_pd_df, test_df_index, exp_scen, mapping, rows):
+@pytest.mark.parametrize("as_arrays", (False, True))
+def test_replace_index_level(
+    test_pd_df, test_df_index, exp_scen, mapping, rows, as_arrays
+):
     """Assert that replace_index_value works as expected"""
 
     test_pd_df["scenario"] = exp_scen if rows is None else ["scen_a"] + exp_scen[1:]
     exp = test_pd_df.set_index(IAMC_IDX)
 
+    # the mapping can also be given as two arrays of current and target values
+    if as_arrays:
+        mapping = (np.array(list(mapping)), np.array(list(mapping.values())))
+
     test_df_index.index = replace_index_values(test_df_index, "scenario", mapping, rows)
     pdt.assert_frame_equal(exp, test_df_index)
 
@@ -190,6 +190,10 @@ def test_reduce_hierarchy_neg1():
     assert utils.reduce_hierarchy("foo|bar|baz", -1) == "foo|bar"
 
 
+def test_reduce_hierarchy_neg1_top_level():
+    assert utils.reduce_hierarchy("foo", -1) == ""
+
+
 def test_reduce_hierarchy_neg2():
     assert utils.reduce_hierarchy("foo|bar|baz", -2) == "foo"
 